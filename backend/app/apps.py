@@ -1,6 +1,32 @@
+import os
+import sys
+
 from django.apps import AppConfig
 
+# Launchers that run management commands rather than serve through ASGI/WSGI
+MANAGEMENT_SCRIPTS = ('manage.py', 'django-admin', os.path.join('django', '__main__.py'))
+
+
+def is_serving_process():
+    """True when this process serves requests: `manage.py runserver` or an ASGI/WSGI server"""
+    if not sys.argv[0].endswith(MANAGEMENT_SCRIPTS):
+        # uvicorn, gunicorn, daphne, ... importing backend.asgi / backend.wsgi
+        return True
+    if sys.argv[1:2] != ['runserver']:
+        # migrate, collectstatic, shell, test, the offline model commands, ...
+        return False
+    # runserver's autoreloader parent only watches files, the child process serves requests
+    return '--noreload' in sys.argv or os.environ.get('RUN_MAIN') == 'true'
+
 
 class AppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'app'
+
+    def ready(self):
+        if not is_serving_process():
+            return
+
+        # Load and warm up at startup rather than on the first request
+        from . import inference
+        inference.load()
@@ -0,0 +1,274 @@
+import os
+import asyncio
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError
+
+import numpy as np
+from django.conf import settings
+
+# The standalone interpreter is all the server needs, full TensorFlow is only
+# required by the offline management commands (see requirements-dev.txt)
+try:
+    # LiteRT, the maintained successor of tflite_runtime built against NumPy 2
+    from ai_edge_litert.interpreter import Interpreter, load_delegate
+except ImportError:
+    from tflite_runtime.interpreter import Interpreter, load_delegate
+
+logger = logging.getLogger(__name__)
+
+# Concurrent requests are coalesced into batches of up to MAX_BATCH images,
+# waiting at most MAX_WAIT_MS after the first one arrives
+MAX_BATCH = 8
+MAX_WAIT_MS = 10
+# Give up on a prediction that hasn't come back after this many seconds
+PREDICT_TIMEOUT = 5.0
+
+
+def available_cpus():
+    """CPUs this process may run on, respecting container/cgroup CPU sets where supported"""
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def load_interpreter():
+    """Build the TFLite interpreter, preferring the INT8 model when it has been generated
+
+    The flatbuffer is memory-mapped as-is, no Keras graph is rebuilt at startup.
+    """
+    if os.path.exists(settings.INT8_MODEL_PATH):
+        model_path = settings.INT8_MODEL_PATH
+    elif os.path.exists(settings.TFLITE_MODEL_PATH):
+        model_path = settings.TFLITE_MODEL_PATH
+    else:
+        raise FileNotFoundError(f"{settings.TFLITE_MODEL_PATH} is missing, run `manage.py convert_model` first")
+
+    delegates = []
+    if settings.TFLITE_DELEGATE_PATH:
+        delegates.append(load_delegate(settings.TFLITE_DELEGATE_PATH))
+
+    # The default op resolver already runs supported FP32 and INT8 ops through XNNPACK
+    num_threads = settings.TFLITE_NUM_THREADS or available_cpus()
+    interpreter = Interpreter(
+        model_path=model_path,
+        num_threads=num_threads,
+        experimental_delegates=delegates or None,
+    )
+    interpreter.allocate_tensors()
+    logger.info(f"Using {model_path} with {num_threads} threads")
+
+    warm_up(interpreter)
+    return interpreter
+
+
+def warm_up(interpreter):
+    """Invoke once on zeros so delegate setup and kernel preparation don't land on the first request"""
+    details = interpreter.get_input_details()[0]
+    interpreter.set_tensor(details['index'], np.zeros(details['shape'], dtype=details['dtype']))
+    interpreter.invoke()
+    logger.info("Warmup complete")
+
+
+class TritonModel:
+    """Forward predictions to a Triton Inference Server over gRPC"""
+
+    def __init__(self, url, model_name):
+        # Only needed when serving remotely
+        import tritonclient.grpc as grpcclient
+
+        self.grpcclient = grpcclient
+        self.client = grpcclient.InferenceServerClient(url=url)
+        self.model_name = model_name
+
+        metadata = self.client.get_model_metadata(model_name)
+        self.input_name = metadata.inputs[0].name
+        self.output_name = metadata.outputs[0].name
+        self.input_shape = tuple(int(dim) for dim in metadata.inputs[0].shape[1:])
+
+    def predict(self, image_array):
+        infer_input = self.grpcclient.InferInput(self.input_name, list(image_array.shape), 'FP32')
+        infer_input.set_data_from_numpy(image_array)
+        result = self.client.infer(
+            self.model_name,
+            [infer_input],
+            outputs=[self.grpcclient.InferRequestedOutput(self.output_name)],
+            client_timeout=5.0,
+        )
+        # as_numpy reads raw_output_contents directly instead of unpacking repeated floats
+        return result.as_numpy(self.output_name)
+
+
+# Model state, populated once by load() from AppConfig.ready() and shared by every request
+interpreter = None
+remote_model = None
+input_details = None
+output_details = None
+input_shape = None
+is_quantized = False
+model_loaded = False
+_batcher = None
+_fork_hook_registered = False
+
+
+_INV_255 = np.float32(1 / 255.0)
+
+
+def write_input(out, pixels):
+    """Write a (H, W, C) uint8 RGB image into out, a (H, W, C) slot of the model's input tensor"""
+    if is_quantized:
+        scale, zero_point = input_details['quantization']
+        if np.isclose(scale, 1 / 255.0) and zero_point == 0:
+            # The quantized graph absorbs the /255 normalization, a plain copy of the pixels
+            out[...] = pixels
+            return
+        quantized = np.multiply(pixels, np.float32(1 / (255.0 * scale)), dtype=np.float32)
+        quantized += zero_point
+        np.rint(quantized, out=quantized)
+        np.clip(quantized, 0, 255, out=quantized)
+        out[...] = quantized
+        return
+
+    # Cast and scale in a single float32 pass straight into the destination
+    np.multiply(pixels, _INV_255, out=out)
+
+
+def prepare_input(pixels):
+    """Turn a (H, W, C) uint8 RGB image into a standalone (1, H, W, C) input tensor"""
+    image_array = np.empty((1,) + pixels.shape, dtype=np.uint8 if is_quantized else np.float32)
+    write_input(image_array[0], pixels)
+    return image_array
+
+
+class MicroBatcher:
+    """Run every invocation on one worker thread, batching requests that arrive together
+
+    The worker thread is the only one touching the interpreter, so no lock is
+    needed around it.
+    """
+
+    def __init__(self, interpreter, max_batch=MAX_BATCH, max_wait_ms=MAX_WAIT_MS):
+        self.interpreter = interpreter
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self.batch_size = 1
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='inference-batcher', daemon=True)
+        self._thread.start()
+
+    def submit(self, pixels):
+        """Queue a (H, W, C) uint8 RGB image, the future resolves to its (1, classes) prediction"""
+        future = Future()
+        self._queue.put((pixels, future))
+        return future
+
+    def _next(self, timeout=None):
+        """Dequeue the next image whose caller is still waiting, raises queue.Empty on timeout"""
+        while True:
+            pixels, future = self._queue.get(timeout=timeout)
+            # Marks the future running so it can no longer be cancelled, False if it already was
+            if future.set_running_or_notify_cancel():
+                return pixels, future
+
+    def _collect(self):
+        items = [self._next()]
+        deadline = time.monotonic() + self.max_wait
+        while len(items) < self.max_batch:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                items.append(self._next(timeout=timeout))
+            except queue.Empty:
+                break
+        return items
+
+    def _invoke(self, images):
+        # Reallocate only when the batch size changes, a steady load keeps its shape
+        if len(images) != self.batch_size:
+            self.interpreter.resize_tensor_input(input_details['index'], (len(images),) + input_shape)
+            self.interpreter.allocate_tensors()
+            self.batch_size = len(images)
+
+        # Normalize each image directly into the interpreter's own input buffer
+        input_buffer = self.interpreter.tensor(input_details['index'])()
+        for i, pixels in enumerate(images):
+            write_input(input_buffer[i], pixels)
+        # invoke() refuses to run while numpy views into its tensors are alive
+        del input_buffer
+
+        self.interpreter.invoke()
+        predictions = self.interpreter.get_tensor(output_details['index'])
+
+        if is_quantized:
+            scale, zero_point = output_details['quantization']
+            predictions = (predictions.astype(np.float32) - zero_point) * scale
+        return predictions
+
+    def _run(self):
+        # Nothing may escape this loop, a dead worker would hang every later prediction
+        while True:
+            items = self._collect()
+            try:
+                predictions = self._invoke([pixels for pixels, _ in items])
+            except Exception as e:
+                logger.error(f"Batch inference failed: {str(e)}")
+                for _, future in items:
+                    self._resolve(future, exception=e)
+                continue
+
+            for i, (_, future) in enumerate(items):
+                self._resolve(future, result=predictions[i:i + 1])
+
+    @staticmethod
+    def _resolve(future, result=None, exception=None):
+        try:
+            if exception is not None:
+                future.set_exception(exception)
+            else:
+                future.set_result(result)
+        except InvalidStateError as e:
+            logger.error(f"Could not deliver prediction: {str(e)}")
+
+
+def load():
+    """Load the model (local interpreter or Triton) and start the batcher"""
+    global interpreter, remote_model, input_details, output_details
+    global input_shape, is_quantized, model_loaded, _batcher, _fork_hook_registered
+
+    interpreter = remote_model = _batcher = None
+    model_loaded = False
+    try:
+        if settings.TRITON_URL:
+            remote_model = TritonModel(settings.TRITON_URL, settings.TRITON_MODEL_NAME)
+            input_shape = remote_model.input_shape
+            logger.info(f"Serving predictions from Triton at {settings.TRITON_URL}")
+        else:
+            interpreter = load_interpreter()
+            input_details = interpreter.get_input_details()[0]
+            output_details = interpreter.get_output_details()[0]
+            input_shape = tuple(input_details['shape'][1:])
+            is_quantized = input_details['dtype'] == np.uint8
+            _batcher = MicroBatcher(interpreter)
+        logger.info("Model loaded successfully")
+    except Exception as e:
+        logger.error(f"Failed to load model: {str(e)}")
+
+    model_loaded = interpreter is not None or remote_model is not None
+
+    # Under gunicorn --preload this runs in the master, but neither the batcher thread
+    # nor the interpreter's thread pool survive fork, so every worker loads its own
+    if not _fork_hook_registered and hasattr(os, 'register_at_fork'):
+        os.register_at_fork(after_in_child=load)
+        _fork_hook_registered = True
+
+
+async def predict(pixels):
+    """Run a single (H, W, C) uint8 RGB image through the model"""
+    if remote_model is not None:
+        # Triton batches server-side
+        return await asyncio.to_thread(remote_model.predict, prepare_input(pixels))
+    # Invokes stay serialized on the batcher thread, the event loop is free meanwhile
+    return await asyncio.wait_for(asyncio.wrap_future(_batcher.submit(pixels)), PREDICT_TIMEOUT)
@@ -0,0 +1,26 @@
+import tensorflow as tf
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from tensorflow.keras.models import load_model
+
+
+class Command(BaseCommand):
+    help = "Convert the Keras H5 model to the TFLite flatbuffer the server loads"
+    # Offline tooling, the URL checks would import the views and the inference module
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default=settings.TFLITE_MODEL_PATH,
+                            help="Where to write the converted model")
+
+    def handle(self, *args, **options):
+        model = load_model(settings.MODEL_PATH)
+        converter = tf.lite.TFLiteConverter.from_keras_model(model)
+        tflite_model = converter.convert()
+
+        with open(options['output'], 'wb') as f:
+            f.write(tflite_model)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {options['output']} ({len(tflite_model) / 1024:.0f} KB)"
+        ))
@@ -0,0 +1,46 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from tensorflow.keras.models import load_model
+
+# Triton fills in the input/output tensors from the SavedModel signature
+CONFIG_TEMPLATE = """name: "{name}"
+platform: "tensorflow_savedmodel"
+max_batch_size: {max_batch_size}
+dynamic_batching {{
+  max_queue_delay_microseconds: {max_queue_delay_us}
+}}
+"""
+
+
+class Command(BaseCommand):
+    help = "Export the Keras model as a SavedModel inside a Triton model repository"
+    # Offline tooling, the URL checks would import the views and the inference module
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument('model_repository', help="Triton model repository directory")
+        parser.add_argument('--model-version', type=int, default=1, help="Model version (default: 1)")
+        parser.add_argument('--max-batch-size', type=int, default=8,
+                            help="Largest batch Triton may form (default: 8)")
+        parser.add_argument('--max-queue-delay-us', type=int, default=10000,
+                            help="How long Triton waits to fill a batch (default: 10000)")
+
+    def handle(self, *args, **options):
+        model_dir = os.path.join(options['model_repository'], settings.TRITON_MODEL_NAME)
+        export_path = os.path.join(model_dir, str(options['model_version']), 'model.savedmodel')
+        if os.path.exists(export_path):
+            raise CommandError(f"{export_path} already exists")
+
+        model = load_model(settings.MODEL_PATH)
+        model.export(export_path)
+
+        with open(os.path.join(model_dir, 'config.pbtxt'), 'w') as f:
+            f.write(CONFIG_TEMPLATE.format(
+                name=settings.TRITON_MODEL_NAME,
+                max_batch_size=options['max_batch_size'],
+                max_queue_delay_us=options['max_queue_delay_us'],
+            ))
+
+        self.stdout.write(self.style.SUCCESS(f"Exported {export_path}"))
@@ -0,0 +1,67 @@
+import os
+import random
+
+import cv2
+import numpy as np
+import tensorflow as tf
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from tensorflow.keras.models import load_model
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+
+class Command(BaseCommand):
+    help = "Post-training INT8 quantize the Keras model into a TFLite flatbuffer"
+    # Offline tooling, the URL checks would import the views and the inference module
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument('data_dir', help="Directory of training images used for calibration")
+        parser.add_argument('--num-samples', type=int, default=100,
+                            help="Number of calibration images (default: 100)")
+        parser.add_argument('--output', default=settings.INT8_MODEL_PATH,
+                            help="Where to write the quantized model")
+
+    def handle(self, *args, **options):
+        image_paths = [
+            os.path.join(root, name)
+            for root, _, files in os.walk(options['data_dir'])
+            for name in files
+            if name.lower().endswith(IMAGE_EXTENSIONS)
+        ]
+        if not image_paths:
+            raise CommandError(f"No images found in {options['data_dir']}")
+
+        random.shuffle(image_paths)
+        image_paths = image_paths[:options['num_samples']]
+
+        model = load_model(settings.MODEL_PATH)
+        height, width = model.input_shape[1:3]
+
+        def representative_dataset_gen():
+            # Calibrate on the same [0, 1] float inputs the FP32 model was trained on
+            for path in image_paths:
+                # Match the decode/resize done in predict_sign
+                image = cv2.imread(path, cv2.IMREAD_COLOR)
+                image = cv2.resize(image, (width, height), interpolation=cv2.INTER_AREA)
+                image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+                image_array = image.astype(np.float32) / 255.0
+                yield [np.expand_dims(image_array, axis=0)]
+
+        # Weights of Conv2D/Dense are quantized per-channel by default for full-integer models
+        converter = tf.lite.TFLiteConverter.from_keras_model(model)
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.representative_dataset = representative_dataset_gen
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+        converter.inference_input_type = tf.uint8
+        converter.inference_output_type = tf.uint8
+        tflite_model = converter.convert()
+
+        with open(options['output'], 'wb') as f:
+            f.write(tflite_model)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {options['output']} ({len(tflite_model) / 1024:.0f} KB, "
+            f"calibrated on {len(image_paths)} images)"
+        ))
@@ -1,3 +1,264 @@
-from django.test import TestCase
+import asyncio
+import base64
+import os
+import threading
+import unittest
+from unittest import mock
 
-# Create your tests here.
+import cv2
+import numpy as np
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase
+
+from . import inference, views
+from .apps import is_serving_process
+
+
+class BlockingInterpreter:
+    """Stand-in for the TFLite interpreter whose invoke() waits until released"""
+
+    def __init__(self):
+        self.invoked = threading.Event()
+        self.release = threading.Event()
+        self._input = np.zeros((1, 64, 64, 3), dtype=np.float32)
+
+    def get_input_details(self):
+        return [{'index': 0, 'shape': np.array(self._input.shape), 'dtype': np.float32,
+                 'quantization': (0.0, 0)}]
+
+    def get_output_details(self):
+        return [{'index': 0}]
+
+    def resize_tensor_input(self, index, shape):
+        self._input = np.zeros(shape, dtype=np.float32)
+
+    def allocate_tensors(self):
+        pass
+
+    def tensor(self, index):
+        return lambda: self._input
+
+    def invoke(self):
+        self.invoked.set()
+        self.release.wait()
+        self._output = self._input.reshape(len(self._input), -1).mean(axis=1, keepdims=True)
+
+    def get_tensor(self, index):
+        return self._output
+
+
+class MicroBatcherTests(SimpleTestCase):
+    def setUp(self):
+        self.interpreter = BlockingInterpreter()
+        patcher = mock.patch.multiple(
+            inference,
+            create=True,
+            remote_model=None,
+            input_details={'index': 0},
+            output_details={'index': 0},
+            input_shape=(64, 64, 3),
+            is_quantized=False,
+            _batcher=inference.MicroBatcher(self.interpreter),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.interpreter.release.set)
+
+    def test_cancelled_prediction_does_not_stall_later_ones(self):
+        pixels = np.full((64, 64, 3), 255, dtype=np.uint8)
+
+        async def scenario():
+            first = asyncio.ensure_future(inference.predict(pixels))
+            # Cancel while the batcher is in the middle of invoking it
+            self.assertTrue(await asyncio.to_thread(self.interpreter.invoked.wait, 2))
+            first.cancel()
+            await asyncio.sleep(0)
+            self.interpreter.release.set()
+            return await asyncio.wait_for(inference.predict(pixels), 2)
+
+        prediction = asyncio.run(scenario())
+        self.assertAlmostEqual(float(prediction[0][0]), 1.0, places=5)
+        self.assertTrue(inference._batcher._thread.is_alive())
+
+
+
+@unittest.skipUnless(hasattr(os, 'fork'), "needs os.fork")
+class LoadAfterForkTests(SimpleTestCase):
+    def setUp(self):
+        def released_interpreter():
+            interpreter = BlockingInterpreter()
+            interpreter.release.set()
+            return interpreter
+
+        # Restore the module's model state once the test is done
+        patcher = mock.patch.multiple(
+            inference,
+            create=True,
+            interpreter=None,
+            remote_model=None,
+            input_details=None,
+            output_details=None,
+            input_shape=None,
+            is_quantized=False,
+            model_loaded=False,
+            _batcher=None,
+            _fork_hook_registered=False,
+            load_interpreter=released_interpreter,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_prediction_resolves_in_forked_worker(self):
+        # As under gunicorn --preload: load in the parent, serve from a forked child
+        inference.load()
+        self.assertTrue(inference.model_loaded)
+        pixels = np.full((64, 64, 3), 255, dtype=np.uint8)
+
+        pid = os.fork()
+        if pid == 0:
+            code = 1
+            try:
+                prediction = asyncio.run(asyncio.wait_for(inference.predict(pixels), 2))
+                code = 0 if abs(float(prediction[0][0]) - 1.0) < 1e-5 else 2
+            finally:
+                os._exit(code)
+
+        _, status = os.waitpid(pid, 0)
+        self.assertEqual(os.waitstatus_to_exitcode(status), 0)
+
+
+class WriteInputTests(SimpleTestCase):
+    def setUp(self):
+        self.pixels = np.arange(64 * 64 * 3, dtype=np.uint32).reshape(64, 64, 3).astype(np.uint8)
+
+    def write_quantized(self, scale, zero_point):
+        out = np.empty(self.pixels.shape, dtype=np.uint8)
+        with mock.patch.multiple(inference, is_quantized=True,
+                                 input_details={'quantization': (scale, zero_point)}):
+            inference.write_input(out, self.pixels)
+        return out
+
+    def test_unit_scale_is_a_plain_copy(self):
+        np.testing.assert_array_equal(self.write_quantized(1 / 255.0, 0), self.pixels)
+
+    def test_other_scales_are_requantized(self):
+        scale, zero_point = 0.9 / 255.0, 3
+        expected = np.clip(np.rint(self.pixels / (255.0 * scale) + zero_point), 0, 255)
+        np.testing.assert_array_equal(self.write_quantized(scale, zero_point), expected)
+
+    def test_float_models_are_scaled_to_unit_range(self):
+        out = np.empty(self.pixels.shape, dtype=np.float32)
+        with mock.patch.object(inference, 'is_quantized', False):
+            inference.write_input(out, self.pixels)
+        np.testing.assert_allclose(out, self.pixels / 255.0, rtol=1e-6)
+
+
+class PredictSignViewTests(SimpleTestCase):
+    def setUp(self):
+        # 29 classes like best_model.h5, C > A > B among the letters
+        self.scores = np.zeros((1, 29), dtype=np.float32)
+        self.scores[0, :3] = [0.2, 0.1, 0.7]
+        self.predict = mock.AsyncMock(return_value=self.scores)
+        patcher = mock.patch.multiple(
+            inference,
+            model_loaded=True,
+            input_shape=(64, 64, 3),
+            predict=self.predict,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        views._prediction_cache.clear()
+        self.addCleanup(views._prediction_cache.clear)
+
+        _, jpeg = cv2.imencode('.jpg', np.full((80, 60, 3), 128, dtype=np.uint8))
+        self.jpeg = jpeg.tobytes()
+
+    async def post_json(self, image, **kwargs):
+        return await self.async_client.post(
+            '/api/predict_sign/', {'image': image}, content_type='application/json', **kwargs
+        )
+
+    async def test_multipart_upload(self):
+        response = await self.async_client.post(
+            '/api/predict_sign/', {'image': SimpleUploadedFile('frame.jpg', self.jpeg, 'image/jpeg')}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['letter'], 'C')
+        self.predict.assert_awaited_once()
+
+    async def test_legacy_base64_data_url(self):
+        image = 'data:image/jpeg;base64,' + base64.b64encode(self.jpeg).decode()
+        response = await self.post_json(image)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['letter'], 'C')
+
+        # The same field posted as a form by older clients
+        response = await self.async_client.post('/api/predict_sign/', {'image': image})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['letter'], 'C')
+
+    async def test_repeated_image_is_served_from_cache(self):
+        image = base64.b64encode(self.jpeg).decode()
+        first = await self.post_json(image)
+        second = await self.post_json(image)
+        self.assertEqual(first.json(), second.json())
+        self.predict.assert_awaited_once()
+
+    async def test_verbose_top_predictions_are_sorted(self):
+        response = await self.async_client.post(
+            '/api/predict_sign/?verbose=1', {'image': base64.b64encode(self.jpeg).decode()},
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 200)
+        top = response.json()['top_predictions']
+        self.assertEqual([p['letter'] for p in top], ['C', 'A', 'B'])
+        self.assertAlmostEqual(top[0]['confidence'], 0.7, places=5)
+
+    async def test_octet_stream_returns_raw_scores(self):
+        response = await self.post_json(
+            base64.b64encode(self.jpeg).decode(), headers={'Accept': 'application/octet-stream'}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/octet-stream')
+        self.assertEqual(len(response.content), 29 * 4)
+        self.assertEqual(response['X-Predicted-Class'], '2')
+        np.testing.assert_array_equal(np.frombuffer(response.content, dtype=np.float32), self.scores[0])
+
+    async def test_timeout_is_reported_as_gateway_timeout(self):
+        self.predict.side_effect = asyncio.TimeoutError
+        response = await self.post_json(base64.b64encode(self.jpeg).decode())
+        self.assertEqual(response.status_code, 504)
+        self.assertEqual(response.json()['error'], "Prediction timed out")
+
+    async def test_inference_failure_is_reported_as_unavailable(self):
+        self.predict.side_effect = RuntimeError("interpreter exploded")
+        response = await self.post_json(base64.b64encode(self.jpeg).decode())
+        self.assertEqual(response.status_code, 503)
+        self.assertIn("interpreter exploded", response.json()['error'])
+
+    async def test_undecodable_image_is_a_client_error(self):
+        response = await self.post_json(base64.b64encode(b'not a jpeg').decode())
+        self.assertEqual(response.status_code, 400)
+        self.predict.assert_not_awaited()
+
+
+class ServingProcessTests(SimpleTestCase):
+    def assertServing(self, argv, expected, environ=None):
+        with mock.patch('sys.argv', argv), mock.patch.dict(os.environ, environ or {}, clear=False):
+            self.assertIs(is_serving_process(), expected, argv)
+
+    def test_management_commands_do_not_load_the_model(self):
+        for command in ('migrate', 'collectstatic', 'shell', 'check', 'test', 'convert_model'):
+            self.assertServing(['manage.py', command], False)
+        self.assertServing(['/usr/bin/django-admin', 'migrate'], False)
+
+    def test_servers_load_the_model(self):
+        self.assertServing(['/venv/bin/uvicorn', 'backend.asgi:application'], True)
+        self.assertServing(['/venv/bin/gunicorn', '--preload', 'backend.wsgi'], True)
+        self.assertServing(['manage.py', 'runserver', '--noreload'], True)
+        self.assertServing(['manage.py', 'runserver'], True, {'RUN_MAIN': 'true'})
+
+    def test_runserver_reloader_parent_does_not_load_the_model(self):
+        with mock.patch.dict(os.environ):
+            os.environ.pop('RUN_MAIN', None)
+            self.assertServing(['manage.py', 'runserver'], False)
@@ -1,41 +1,88 @@
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse
 from django.views.decorators.csrf import csrf_exempt
-from tensorflow.keras.models import load_model
-from PIL import Image
+import cv2
+import asyncio
 import base64
-import io
+import hashlib
 import numpy as np
 import logging
 import json
+import orjson
+import threading
+from collections import OrderedDict
+
+from . import inference
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
-# Model loading (do this once at startup)
-try:
-    MODEL_PATH = "/home/baraka-blessed/Blessed-react/american_sign_language/backend/app/models/best_model.h5"
-    model = load_model(MODEL_PATH)
-    logger.info("Model loaded successfully")
-except Exception as e:
-    logger.error(f"Failed to load model: {str(e)}")
-    model = None
+# Decoding is one small image per request, don't let OpenCV spin up a thread pool
+cv2.setNumThreads(1)
+
+# Class index -> letter, shared by the letter lookup and ?verbose=1 top predictions
+ASL_LETTERS = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+# Webcam clients often resend identical frames, remember recent predictions by content hash
+PREDICTION_CACHE_SIZE = 1024
+_prediction_cache = OrderedDict()
+_prediction_cache_lock = threading.Lock()
+
+def get_cached_prediction(key):
+    with _prediction_cache_lock:
+        prediction = _prediction_cache.get(key)
+        if prediction is not None:
+            _prediction_cache.move_to_end(key)
+        return prediction
+
+def cache_prediction(key, prediction):
+    with _prediction_cache_lock:
+        _prediction_cache[key] = prediction
+        _prediction_cache.move_to_end(key)
+        if len(_prediction_cache) > PREDICTION_CACHE_SIZE:
+            _prediction_cache.popitem(last=False)
+
+def json_response(payload, status=200):
+    """JsonResponse replacement encoded with orjson, which takes numpy scalars as-is"""
+    return HttpResponse(
+        orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY),
+        content_type='application/json',
+        status=status
+    )
+
+def preprocess_image(image_bytes):
+    """Decode and resize an uploaded image into (H, W, C) uint8 RGB pixels"""
+    image = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_COLOR)
+    if image is None:
+        raise ValueError("Could not decode image")
+    
+    # Resize to expected dimensions (64x64 based on model requirements)
+    image = cv2.resize(image, (64, 64), interpolation=cv2.INTER_AREA)
+    
+    # OpenCV decodes to BGR, the model expects RGB
+    return cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
 
 @csrf_exempt
-def predict_sign(request):
+async def predict_sign(request):
     if request.method != "POST":
         return JsonResponse({'success': False, 'error': "Only POST requests allowed"}, status=405)
     
-    if model is None:
+    if not inference.model_loaded:
         return JsonResponse({'success': False, 'error': "Model not loaded"}, status=500)
 
     try:
         # Check content type and handle accordingly
         content_type = request.content_type
+        image_bytes = None
         
         if content_type.startswith('multipart/form-data'):
-            # Handle FormData from frontend
-            image_data = request.POST.get('image')
-            if not image_data:
+            # Handle FormData from frontend, a binary file upload needs no base64 decoding
+            image_file = request.FILES.get('image')
+            if image_file:
+                image_bytes = image_file.read()
+                image_data = None
+            else:
+                image_data = request.POST.get('image')
+            if not image_bytes and not image_data:
                 return JsonResponse({'success': False, 'error': "No image data in form"}, status=400)
         
         elif content_type == 'application/json':
@@ -56,65 +103,99 @@ def predict_sign(request):
             params = parse_qs(body)
             image_data = params.get('image', [''])[0]
         
-        if not image_data:
-            return JsonResponse({'success': False, 'error': "No image data provided"}, status=400)
+        if image_bytes is None:
+            # Legacy base64 payload
+            if not image_data:
+                return JsonResponse({'success': False, 'error': "No image data provided"}, status=400)
 
-        # Remove data URL prefix if present (data:image/jpeg;base64,)
-        if ',' in image_data:
-            image_data = image_data.split(',')[1]
+            # Remove data URL prefix if present (data:image/jpeg;base64,)
+            if ',' in image_data:
+                image_data = image_data.split(',')[1]
 
+        # Only decoding failures are the client's fault (400)
         try:
             # Decode base64 image
-            image_bytes = base64.b64decode(image_data)
-            image = Image.open(io.BytesIO(image_bytes))
-            
-            # Convert to RGB if needed
-            if image.mode != 'RGB':
-                image = image.convert('RGB')
+            if image_bytes is None:
+                image_bytes = base64.b64decode(image_data)
             
-            # Resize to expected dimensions (64x64 based on model requirements)
-            image = image.resize((64, 64))
+            # Repeated frames skip decoding and inference entirely
+            cache_key = hashlib.blake2b(image_bytes, digest_size=16).digest()
+            prediction = get_cached_prediction(cache_key)
             
-            # Convert to numpy array and normalize
-            image_array = np.array(image) / 255.0
-            image_array = np.expand_dims(image_array, axis=0)
+            # Decoding releases the GIL, run it off the event loop
+            if prediction is None:
+                image = await asyncio.to_thread(preprocess_image, image_bytes)
             
+        except Exception as e:
+            logger.error(f"Image processing error: {str(e)}")
+            return JsonResponse({
+                'success': False,
+                'error': f"Image processing error: {str(e)}"
+            }, status=400)
+        
+        if prediction is None:
             # Verify input shape
-            if image_array.shape[1:] != model.input_shape[1:]:
+            if image.shape != inference.input_shape:
                 return JsonResponse({
                     'success': False,
-                    'error': f"Invalid image dimensions. Expected {model.input_shape[1:]}, got {image_array.shape[1:]}"
+                    'error': f"Invalid image dimensions. Expected {inference.input_shape}, got {image.shape}"
                 }, status=400)
 
-            # Make prediction
-            prediction = model.predict(image_array)
-            predicted_class = np.argmax(prediction)
-            confidence = np.max(prediction)
-            
-            # Map to ASL letters
-            asl_letters = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
-            if predicted_class >= len(asl_letters):
+            # Make prediction, failures here are on our side rather than the client's
+            try:
+                prediction = await inference.predict(image)
+            except asyncio.TimeoutError:
+                logger.error("Prediction timed out")
+                return JsonResponse({'success': False, 'error': "Prediction timed out"}, status=504)
+            except Exception as e:
+                logger.error(f"Inference error: {str(e)}")
                 return JsonResponse({
                     'success': False,
-                    'error': f"Invalid class index {predicted_class}"
-                }, status=500)
-            
-            predicted_letter = asl_letters[predicted_class]
-            
-            logger.info(f"Prediction successful: {predicted_letter} with confidence {confidence:.2f}")
-            
-            return JsonResponse({
-                'letter': predicted_letter,
-                'confidence': float(confidence),
-                'success': True
-            })
-            
-        except Exception as e:
-            logger.error(f"Image processing error: {str(e)}")
+                    'error': f"Inference error: {str(e) or type(e).__name__}"
+                }, status=503)
+            cache_prediction(cache_key, prediction)
+        
+        # One scan for the class, the model ends in softmax so its score is the confidence
+        predicted_class = int(prediction[0].argmax())
+        confidence = prediction[0][predicted_class]
+        
+        # Map to ASL letters
+        if predicted_class >= len(ASL_LETTERS):
             return JsonResponse({
                 'success': False,
-                'error': f"Image processing error: {str(e)}"
-            }, status=400)
+                'error': f"Invalid class index {predicted_class}"
+            }, status=500)
+        
+        predicted_letter = ASL_LETTERS[predicted_class]
+        
+        logger.info(f"Prediction successful: {predicted_letter} with confidence {confidence:.2f}")
+        
+        # Clients sending Accept: application/octet-stream get the raw float32 scores
+        if 'application/octet-stream' in request.headers.get('Accept', ''):
+            response = HttpResponse(
+                prediction[0].astype(np.float32, copy=False).tobytes(),
+                content_type='application/octet-stream'
+            )
+            response['X-Predicted-Class'] = str(predicted_class)
+            return response
+        
+        response = {
+            'letter': predicted_letter,
+            'confidence': confidence,
+            'success': True
+        }
+        
+        # Only score other letters when the client asks for them (?verbose=1)
+        if request.GET.get('verbose') == '1':
+            letter_scores = prediction[0][:len(ASL_LETTERS)]
+            top_classes = np.argpartition(letter_scores, -3)[-3:]
+            top_classes = top_classes[np.argsort(letter_scores[top_classes])[::-1]]
+            response['top_predictions'] = [
+                {'letter': ASL_LETTERS[i], 'confidence': letter_scores[i]}
+                for i in top_classes
+            ]
+        
+        return json_response(response)
             
     except Exception as e:
         logger.error(f"Server error: {str(e)}")
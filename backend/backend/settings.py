@@ -142,11 +142,45 @@ CORS_ALLOWED_ORIGINS = [
 
 CORS_ALLOW_CREDENTIALS = True
 
+# Lets browsers read the predicted class on raw octet-stream responses
+CORS_EXPOSE_HEADERS = ['X-Predicted-Class']
+
 CSRF_TRUSTED_ORIGINS = [
     "http://localhost:5173",
     "http://127.0.0.1:5173",
 ]
 
 MODEL_PATH = os.path.join(BASE_DIR, 'app', 'models', 'best_model.h5')
+# Built offline by `manage.py convert_model`, required unless INT8_MODEL_PATH exists
+TFLITE_MODEL_PATH = os.path.join(BASE_DIR, 'app', 'models', 'best_model.tflite')
+# Produced offline by `manage.py quantize_model`, preferred over TFLITE_MODEL_PATH when present
+INT8_MODEL_PATH = os.path.join(BASE_DIR, 'app', 'models', 'best_model_int8.tflite')
+
+# Interpreter threads, defaults to the CPUs this process may run on
+TFLITE_NUM_THREADS = int(os.environ.get('TFLITE_NUM_THREADS', 0)) or None
+# Optional external delegate library, e.g. a custom XNNPACK build
+TFLITE_DELEGATE_PATH = os.environ.get('TFLITE_DELEGATE_PATH')
+
+# Set TRITON_URL (e.g. localhost:8001) to run inference on a Triton server over gRPC
+# instead of in-process, see `manage.py export_saved_model` and requirements-triton.txt
+TRITON_URL = os.environ.get('TRITON_URL')
+TRITON_MODEL_NAME = os.environ.get('TRITON_MODEL_NAME', 'asl')
+
+# Send the app's INFO logs (model loading, "Warmup complete") to the console
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'app': {
+            'handlers': ['console'],
+            'level': 'INFO',
+        },
+    },
+}
 
 DATA_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024 
\ No newline at end of file
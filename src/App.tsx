@@ -14,6 +14,12 @@ type BoundingBox = {
   height: number;
 };
 
+// Frames are downscaled before upload, slightly above the model's 64x64 input
+// so the server-side resize still has detail to work with
+const UPLOAD_SIZE = 96;
+const UPLOAD_QUALITY = 0.85;
+const FULL_FRAME: BoundingBox = { x: 0, y: 0, width: 1, height: 1 };
+
 const App = () => {
   const videoRef = useRef<HTMLVideoElement>(null);
   const canvasRef = useRef<HTMLCanvasElement>(null);
@@ -176,10 +182,15 @@ const App = () => {
     setStartPoint(null);
   };
 
+  // Encode a canvas as a JPEG blob for multipart upload
+  const canvasToBlob = (canvas: HTMLCanvasElement, quality: number): Promise<Blob | null> => {
+    return new Promise(resolve => canvas.toBlob(resolve, 'image/jpeg', quality));
+  };
+
   // Crop image to bounding box
-  const cropImageToBoundingBox = (canvas: HTMLCanvasElement, box: BoundingBox): string => {
+  const cropImageToBoundingBox = (canvas: HTMLCanvasElement, box: BoundingBox): Promise<Blob | null> => {
     const ctx = canvas.getContext('2d');
-    if (!ctx) return '';
+    if (!ctx) return Promise.resolve(null);
     
     const cropX = box.x * canvas.width;
     const cropY = box.y * canvas.height;
@@ -189,19 +200,19 @@ const App = () => {
     // Create a new canvas for the cropped image
     const cropCanvas = document.createElement('canvas');
     const cropCtx = cropCanvas.getContext('2d');
-    if (!cropCtx) return '';
+    if (!cropCtx) return Promise.resolve(null);
     
-    cropCanvas.width = 64; // Match model input size
-    cropCanvas.height = 64;
+    cropCanvas.width = UPLOAD_SIZE;
+    cropCanvas.height = UPLOAD_SIZE;
     
-    // Draw the cropped region onto the new canvas, scaled to 64x64
+    // Draw the cropped region onto the new canvas, scaled to the upload size
     cropCtx.drawImage(
       canvas,
       cropX, cropY, cropWidth, cropHeight,
-      0, 0, 64, 64
+      0, 0, UPLOAD_SIZE, UPLOAD_SIZE
     );
     
-    return cropCanvas.toDataURL('image/jpeg', 0.8);
+    return canvasToBlob(cropCanvas, UPLOAD_QUALITY);
   };
 
   // Start camera
@@ -253,7 +264,7 @@ const App = () => {
       canvas.height = video.videoHeight;
       context.drawImage(video, 0, 0, canvas.width, canvas.height);
 
-      let imageData: string;
+      let imageBlob: Blob | null;
       let currentBox = boundingBox;
 
       // Try motion detection if enabled
@@ -267,15 +278,15 @@ const App = () => {
 
       // Crop to bounding box if available
       if (currentBox) {
-        imageData = cropImageToBoundingBox(canvas, currentBox);
+        imageBlob = await cropImageToBoundingBox(canvas, currentBox);
         
         // Update overlay
         if (overlayCanvasRef.current && showBoundingBox) {
           drawBoundingBox(currentBox, overlayCanvasRef.current);
         }
       } else {
-        // Use full image if no bounding box
-        imageData = canvas.toDataURL('image/jpeg', 0.7);
+        // Use full image if no bounding box, still downscaled before upload
+        imageBlob = await cropImageToBoundingBox(canvas, FULL_FRAME);
         
         if (!useHandDetection && !boundingBox) {
           setError('Please select a bounding box around your hand first, or enable motion detection.');
@@ -284,15 +295,17 @@ const App = () => {
         }
       }
 
-      // Send prediction request
+      if (!imageBlob) {
+        throw new Error('Could not encode frame');
+      }
+
+      // Send prediction request as a raw JPEG upload
+      const formData = new FormData();
+      formData.append('image', imageBlob, 'frame.jpg');
+
       const response = await fetch("http://127.0.0.1:8000/api/predict_sign/", {
         method: "POST",
-        headers: {
-          'Content-Type': 'application/json',
-        },
-        body: JSON.stringify({
-          image: imageData
-        })
+        body: formData
       });
 
       if (!response.ok) {